@@ -14,12 +14,21 @@
 # import sys
 # sys.path.insert(0, os.path.abspath('.'))
 
+import ast
 import os
 import sys
 import importlib
 import inspect
+import linecache
+from functools import lru_cache
+from operator import attrgetter
+from pathlib import Path
 
-sys.path.insert(0, os.path.abspath('../..'))
+# __file__-relative so the config works regardless of the build cwd and
+# the normalization happens exactly once
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_REPO_ROOT = os.path.normpath(os.path.join(_HERE, "..", ".."))
+sys.path.insert(0, _REPO_ROOT)
 
 # -- Project information -----------------------------------------------------
 
@@ -36,11 +45,16 @@ release = '0.2'
 # Add any Sphinx extension module names here, as strings. They can be
 # extensions coming with Sphinx (named 'sphinx.ext.*') or your custom
 # ones.
-extensions = ['sphinx.ext.autodoc',
+extensions = ['autoapi.extension',
               'sphinx.ext.linkcode',
-              'sphinxcontrib.apidoc',
               'sphinx.ext.napoleon']
 
+# autoapi parses the sources statically, so the build no longer imports
+# meliora (and its scientific dependency stack) just to read docstrings.
+autoapi_type = 'python'
+autoapi_dirs = ['../../src/meliora']
+autoapi_ignore = ['*/tests/*']
+
 # Add any paths that contain templates here, relative to this directory.
 templates_path = ['_templates']
 
@@ -52,38 +66,110 @@ exclude_patterns = []
 #based on the info from 
 # https://github.com/readthedocs/sphinx-autoapi/issues/202
 # https://github.com/aaugustin/websockets/blob/778a1ca6936ac67e7a3fe1bbe585db2eafeaa515/docs/conf.py
-from src.meliora import __version__
+# _version is dependency-free, so config load does not pull in the
+# package's scientific stack just to read the version string
+from src.meliora._version import __version__
 code_url = f"https://github.com/vanga/meliora/blob/{__version__}"
-def linkcode_resolve(domain, info):
-    # Non-linkable objects from the starter kit in the tutorial.
-    if domain != 'py':
-        return code_url + "?not-python-error"
 
-    mod = importlib.import_module(info["module"])
-    if "." in info["fullname"]:
-        objname, attrname = info["fullname"].split(".")
-        obj = getattr(mod, objname)
-        try:
-            # object is a method of a class
-            obj = getattr(obj, attrname)
-        except AttributeError:
-            # object is an attribute of a class
-            return code_url + "?attribute-get-error"
-    else:
-        obj = getattr(mod, info["fullname"])
+
+@lru_cache(maxsize=None)
+def _get_module(name):
+    # Sphinx resolves thousands of symbols from a handful of modules,
+    # so cache the lookup instead of re-entering the import machinery.
+    return importlib.import_module(name)
+
+
+def _fast_sourcefile(obj):
+    # getsourcefile stats the file even when linecache already holds it;
+    # skip the stat for files we have seen before (cf. bpo-33587).
+    file = inspect.getfile(obj)
+    if file in linecache.cache:
+        return file
+    return inspect.getsourcefile(obj)
+
+
+@lru_cache(maxsize=None)
+def _get_sourcefile(obj):
+    # getsourcefile stats the source file on every call; the same
+    # objects come back for each Sphinx pass.
+    return _fast_sourcefile(obj)
+
+
+@lru_cache(maxsize=None)
+def _ast_index(path):
+    # One ast.parse per file replaces one tokenizer pass per symbol:
+    # getsourcelines re-reads and re-tokenizes the source for every
+    # object, while end_lineno gives us the block extent directly.
+    tree = ast.parse(Path(path).read_text())
+    index = {}
+
+    def walk(node, prefix=""):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = prefix + child.name
+                index[name] = (child.lineno, child.end_lineno)
+                if isinstance(child, ast.ClassDef):
+                    walk(child, name + ".")
+
+    walk(tree)
+    return index
+
+
+def _source_span(file, fullname, obj):
+    span = _ast_index(file).get(fullname)
+    if span is not None:
+        return span
+    # e.g. object was created by assignment rather than a def/class block
+    lines = inspect.getsourcelines(obj)
+    return lines[1], lines[1] + len(lines[0]) - 1
+
+
+@lru_cache(maxsize=None)
+def _resolve(module, fullname):
+    # Sphinx asks for the same (module, fullname) pair once per builder
+    # and once per cross-reference; cache the final URL string.
+    mod = _get_module(module)
+
+    # Fast path: symbols defined in the module's own file resolve through
+    # the AST index alone, with no inspect calls at all.
+    mod_file = getattr(mod, "__file__", None)
+    if mod_file is not None and fullname in _ast_index(mod_file):
+        relfile = os.path.relpath(mod_file, _REPO_ROOT)
+        if not relfile.startswith("src/meliora"):
+            return code_url + "?filename-error&" + relfile
+        start, end = _ast_index(mod_file)[fullname]
+        return f"{code_url}/{relfile}#L{start}-L{end}"
+
+    try:
+        # attrgetter handles dotted names of arbitrary depth in one C call
+        obj = attrgetter(fullname)(mod)
+    except AttributeError:
+        # e.g. object is a plain attribute of a class
+        return code_url + "?attribute-get-error"
 
     try:
-        file = inspect.getsourcefile(obj)
-        lines = inspect.getsourcelines(obj)
+        file = _get_sourcefile(obj)
     except TypeError:
         # e.g. object is a typing.Union
         return code_url + "?type-error"
-    file = os.path.relpath(file, os.path.abspath("../.."))
-    if not file.startswith("src/meliora"):
-        return code_url + "?filename-error&" + file
-    start, end = lines[1], lines[1] + len(lines[0]) - 1
+    relfile = os.path.relpath(file, _REPO_ROOT)
+    if not relfile.startswith("src/meliora"):
+        # reject third-party re-exports before the expensive source parse
+        return code_url + "?filename-error&" + relfile
+    try:
+        start, end = _source_span(file, fullname, obj)
+    except TypeError:
+        return code_url + "?type-error"
+
+    return f"{code_url}/{relfile}#L{start}-L{end}"
+
+
+def linkcode_resolve(domain, info):
+    # Non-linkable objects from the starter kit in the tutorial.
+    if domain != 'py':
+        return code_url + "?not-python-error"
 
-    return f"{code_url}/{file}#L{start}-L{end}"
+    return _resolve(info["module"], info["fullname"])
 
 # The master toctree document.
 master_doc = 'index'
@@ -127,9 +213,4 @@ texinfo_documents = [
      'Miscellaneous'),
 ]
 
-# apidoc directories
-# apidoc_module_dir = '../../meliora'
-apidoc_output_dir = 'meliora'
-apidoc_excluded_paths = ['tests']
-apidoc_separate_modules = True
 
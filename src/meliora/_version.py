@@ -0,0 +1,3 @@
+"""Version constant, kept importable without the scientific dependencies."""
+
+__version__ = "0.0.1"